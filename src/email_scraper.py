@@ -1,13 +1,14 @@
 from __future__ import annotations
+import asyncio
 import random
 import re
-import time
+from collections import defaultdict
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, List, Set
 from urllib.parse import urljoin, urlparse
 
-import requests
-from bs4 import BeautifulSoup
+import aiohttp
 
 
 @dataclass
@@ -31,20 +32,31 @@ class RequestCfg:
 
 
 EMAIL_RE = re.compile(r"[A-Z0-9._%+-]+@[A-Z0-9.-]+\.[A-Z]{2,}", re.I)
+MAILTO_RE = re.compile(r"mailto:([^\"'?\s>]+)", re.I)
 
+# Cap on how many pages are fetched concurrently across the whole run.
+MAX_CONCURRENT_FETCHES = 20
 
-def _sleep(min_s: float, max_s: float):
+# Politeness cap on concurrent requests against any single hostname.
+MAX_CONCURRENT_PER_HOST = 4
+
+
+async def _sleep(min_s: float, max_s: float):
     """
     Sleep for a random duration between min_s and max_s seconds.
     Helps to mimic human browsing behavior to avoid server blocks.
     """
-    time.sleep(random.uniform(min_s, max_s))
+    await asyncio.sleep(random.uniform(min_s, max_s))
 
 
+@lru_cache(maxsize=8192)
 def _normalize_url(url: str) -> str:
     """
     Ensure the URL has a proper scheme (default https:// if missing).
 
+    Called repeatedly on the same website strings when building crawl
+    candidates, so results are memoized.
+
     Args:
       url: raw URL string
 
@@ -60,39 +72,88 @@ def _normalize_url(url: str) -> str:
     return url
 
 
-def _request_text(url: str, cfg: RequestCfg, logger) -> str:
+# Streaming scan parameters: chunk size read off the socket and the tail
+# carried between chunks so addresses split across a boundary still match.
+_CHUNK_SIZE = 65536
+_TAIL_LEN = 64
+
+# Emails almost always sit in the first screen or the footer template;
+# scanning past this many bytes is wasted bandwidth and CPU.
+_MAX_SCAN_BYTES = 131072
+
+# Content types worth scanning for addresses
+_TEXT_TYPES = ("text/", "application/xhtml")
+
+
+async def _stream_emails_async(session: aiohttp.ClientSession, url: str, cfg: RequestCfg, logger) -> Set[str]:
     """
-    Fetch the HTML content of a given URL using requests.
+    Fetch a page through the shared aiohttp session and scan it for email
+    addresses chunk by chunk, without ever buffering the full document.
 
     Retries on failures (timeouts, 5xx errors) with exponential backoff.
 
     Args:
+      session: shared aiohttp.ClientSession (connection pool)
       url: URL to fetch
       cfg: RequestCfg instance with request settings
       logger: logger instance for logging messages
 
     Returns:
-      The HTML content of the page as a string.
+      Set of lowercase email addresses found on the page.
 
     Raises:
       RuntimeError if all retries fail.
     """
     url = _normalize_url(url)
     last_err = None
+    range_headers = {"Range": f"bytes=0-{_MAX_SCAN_BYTES - 1}"}
     for attempt in range(1, cfg.retries + 1):
         try:
-            r = requests.get(url, headers=cfg.headers, timeout=cfg.timeout, allow_redirects=True)
-            if r.status_code >= 500:
-                raise requests.RequestException(f"Server {r.status_code}")
-            return r.text
+            timeout = aiohttp.ClientTimeout(total=cfg.timeout)
+            async with session.get(url, timeout=timeout, allow_redirects=True,
+                                   headers=range_headers) as r:
+                if r.status == 416:
+                    # Server rejects ranges outright; retry this attempt plain
+                    async with session.get(url, timeout=timeout, allow_redirects=True) as r2:
+                        return await _scan_response(r2)
+                if r.status >= 500:
+                    raise aiohttp.ClientResponseError(
+                        r.request_info, r.history, status=r.status, message=f"Server {r.status}"
+                    )
+                return await _scan_response(r)
         except Exception as e:
             last_err = e
             logger.warning(f"[{attempt}/{cfg.retries}] GET {url} failed -> {e}")
             if attempt < cfg.retries:
-                time.sleep(cfg.backoff_factor ** attempt)
+                await asyncio.sleep(cfg.backoff_factor ** attempt)
     raise RuntimeError(f"Failed to fetch {url}: {last_err}")
 
 
+async def _scan_response(r: aiohttp.ClientResponse) -> Set[str]:
+    """
+    Stream a response body through the email regexes.
+
+    Skips non-text payloads (images, PDFs) entirely and stops reading
+    once _MAX_SCAN_BYTES have been scanned, for servers that ignore the
+    Range request header and send the full document anyway.
+    """
+    ctype = (r.headers.get("Content-Type") or "").lower()
+    if ctype and not any(ctype.startswith(t) for t in _TEXT_TYPES):
+        return set()
+
+    emails: Set[str] = set()
+    tail = ""
+    scanned = 0
+    async for chunk in r.content.iter_chunked(_CHUNK_SIZE):
+        buf = tail + chunk.decode("utf-8", errors="ignore")
+        emails |= _extract_emails_from_html(buf)
+        tail = buf[-_TAIL_LEN:]
+        scanned += len(chunk)
+        if scanned >= _MAX_SCAN_BYTES:
+            break
+    return emails
+
+
 def _extract_emails_from_html(html: str) -> Set[str]:
     """
     Extract all email addresses from the HTML content.
@@ -101,6 +162,9 @@ def _extract_emails_from_html(html: str) -> Set[str]:
       - plain text emails matching regex
       - mailto: links in anchor tags
 
+    Runs two compiled regexes over the raw HTML instead of building a
+    DOM, which avoids one full parse per fetched page.
+
     Args:
       html: page HTML
 
@@ -110,27 +174,75 @@ def _extract_emails_from_html(html: str) -> Set[str]:
     if not html:
         return set()
     emails = set(EMAIL_RE.findall(html))
-    soup = BeautifulSoup(html, "html.parser")
-    for a in soup.select("a[href^='mailto:']"):
-        href = a.get("href", "")
-        m = re.search(r"mailto:([^?]+)", href, re.I)
-        if m:
-            emails.add(m.group(1).strip())
+    emails |= set(MAILTO_RE.findall(html))
     return {e.strip().lower() for e in emails}
 
 
-def scrape_emails_for_profiles(profiles: List[Dict], email_cfg: Dict, request_cfg: Dict, logger) -> List[Dict]:
+def _build_tries(row: Dict, crawl_paths: List[str], max_pages_per_site: int) -> List[str]:
     """
-    Crawl each company's website and profile page to extract email addresses.
+    Build the list of candidate URLs to crawl for one profile.
 
-    Args:
-      profiles: list of company dicts with keys: company_name, country, profile_url, website_url
-      email_cfg: config dict for email crawling (crawl_paths, max_pages_per_site)
-      request_cfg: dict with timeout, delays, headers for requests
-      logger: logger instance for logging info and warnings
+    Prefers the company's own website plus common contact/about paths;
+    falls back to the directory profile page when no website is known.
+    """
+    website_url = row.get("website_url", "")
+    profile_url = row.get("profile_url", "")
+
+    tries: List[str] = []
+    if website_url:
+        normalized_website = _normalize_url(website_url)
+        tries.append(normalized_website)
+        for p in crawl_paths[:max_pages_per_site]:
+            try:
+                tries.append(urljoin(normalized_website, p))
+            except Exception:
+                pass
+    else:
+        tries.append(_normalize_url(profile_url))
+    return tries[:max_pages_per_site]
 
-    Returns:
-      List of dicts: each dict contains name, country, and a single email
+
+async def _fetch_emails_for_urls(urls: List[str], req: RequestCfg, logger) -> Dict[str, Set[str]]:
+    """
+    Fetch every unique candidate URL exactly once and collect its emails.
+
+    Runs under a shared semaphore so that at most MAX_CONCURRENT_FETCHES
+    pages are in flight at once, plus a per-hostname semaphore so that
+    no single site sees more than MAX_CONCURRENT_PER_HOST requests.
+    """
+    sem = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+    host_sems: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(MAX_CONCURRENT_PER_HOST))
+    connector = aiohttp.TCPConnector(
+        limit=100, limit_per_host=4, use_dns_cache=True, ttl_dns_cache=600,
+        enable_cleanup_closed=True,
+    )
+
+    async with aiohttp.ClientSession(connector=connector, headers=req.headers) as session:
+
+        async def fetch(idx: int, page_url: str) -> tuple[str, Set[str]]:
+            host_sem = host_sems[urlparse(_normalize_url(page_url)).netloc]
+            async with sem, host_sem:
+                logger.info(f"[{idx}/{len(urls)}] Fetching: {page_url}")
+                try:
+                    return page_url, await _stream_emails_async(session, page_url, req, logger)
+                except Exception as e:
+                    logger.debug(f"  failed fetch {page_url}: {e}")
+                    return page_url, set()
+                finally:
+                    await _sleep(req.min_delay, req.max_delay)
+
+        pairs = await asyncio.gather(*[fetch(i, u) for i, u in enumerate(urls, start=1)])
+
+    return dict(pairs)
+
+
+async def _scrape_emails_async(profiles: List[Dict], email_cfg: Dict, request_cfg: Dict, logger) -> List[Dict]:
+    """
+    Async driver: fetch the deduplicated set of candidate pages once, then
+    fan the per-URL results back out to every profile that references them.
+
+    Companies sharing a website (franchises, redirects) would otherwise
+    cause the same pages to be fetched multiple times.
     """
     req = RequestCfg(
         timeout=int(request_cfg.get("timeout", 20)),
@@ -144,43 +256,43 @@ def scrape_emails_for_profiles(profiles: List[Dict], email_cfg: Dict, request_cf
     crawl_paths = email_cfg.get("crawl_paths", ["/", "/contact", "/contact-us", "/about", "/impressum"])
     max_pages_per_site = int(email_cfg.get("max_pages_per_site", 3))
 
-    results: List[Dict] = []
+    # First pass: candidate URLs per profile, deduplicated across profiles
+    tries_by_profile = [_build_tries(row, crawl_paths, max_pages_per_site) for row in profiles]
+    unique_urls = sorted({u for tries in tries_by_profile for u in tries})
+    logger.info(f"Fetching {len(unique_urls)} unique pages for {len(profiles)} profiles")
+
+    emails_by_url = await _fetch_emails_for_urls(unique_urls, req, logger)
 
-    for i, row in enumerate(profiles, start=1):
+    # Second pass: assemble per-profile emails from the shared fetch results
+    results: List[Dict] = []
+    for row, tries in zip(profiles, tries_by_profile):
         name = (row.get("company_name") or "").strip()
         country = (row.get("country") or "").strip()
         profile_url = row.get("profile_url", "")
-        website_url = row.get("website_url", "")
-
-        logger.info(f"[{i}/{len(profiles)}] Scraping emails for: {name or profile_url}")
 
         emails_found: Set[str] = set()
-
-        tries = []
-        if website_url:
-            normalized_website = _normalize_url(website_url)
-            tries.append(normalized_website)
-            for p in crawl_paths[:max_pages_per_site]:
-                try:
-                    tries.append(urljoin(normalized_website, p))
-                except Exception:
-                    pass
-        else:
-            normalized_profile = _normalize_url(profile_url)
-            tries.append(normalized_profile)
-
-        for j, page_url in enumerate(tries[:max_pages_per_site], start=1):
-            try:
-                html = _request_text(page_url, req, logger)
-                emails_found |= _extract_emails_from_html(html)
-            except Exception as e:
-                logger.debug(f"  failed fetch {page_url}: {e}")
-            _sleep(req.min_delay, req.max_delay)
-
-        for em in sorted(emails_found):
-            results.append({"name": name, "country": country, "email": em})
+        for u in tries:
+            emails_found |= emails_by_url.get(u, set())
 
         if not emails_found:
             logger.info(f"  No emails found for {name or profile_url}")
 
+        results.extend({"name": name, "country": country, "email": em} for em in sorted(emails_found))
+
     return results
+
+
+def scrape_emails_for_profiles(profiles: List[Dict], email_cfg: Dict, request_cfg: Dict, logger) -> List[Dict]:
+    """
+    Crawl each company's website and profile page to extract email addresses.
+
+    Args:
+      profiles: list of company dicts with keys: company_name, country, profile_url, website_url
+      email_cfg: config dict for email crawling (crawl_paths, max_pages_per_site)
+      request_cfg: dict with timeout, delays, headers for requests
+      logger: logger instance for logging info and warnings
+
+    Returns:
+      List of dicts: each dict contains name, country, and a single email
+    """
+    return asyncio.run(_scrape_emails_async(profiles, email_cfg, request_cfg, logger))
@@ -1,19 +1,32 @@
 from __future__ import annotations
+import asyncio
 import random
 import time
 import re
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, List, Tuple, Set
 from urllib.parse import urljoin, urlparse
 
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+from requests_cache import CachedSession
 from bs4 import BeautifulSoup
 
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    _HAVE_SELECTOLAX = True
+except ImportError:  # pragma: no cover - depends on optional install
+    _HAVE_SELECTOLAX = False
+
 
 @dataclass
 class RequestCfg:
     """
     Configuration for HTTP requests.
+    The optional session enables HTTP keep-alive so successive requests
+    to the same host reuse one TCP+TLS connection.
     """
     timeout: int = 25
     retries: int = 3
@@ -21,6 +34,30 @@ class RequestCfg:
     min_delay: float = 1.0
     max_delay: float = 2.0
     headers: dict | None = None
+    session: requests.Session | None = None
+
+
+def _make_session(headers: dict | None, cache_name: str = ".http_cache") -> requests.Session:
+    """
+    Build a pooled session with keep-alive for repeated fetches against
+    the same host (avoids a TLS handshake per request). Responses are
+    cached on disk (SQLite) for a day, so reruns and resumed crawls skip
+    pages that were already fetched.
+    """
+    s = CachedSession(cache_name, expire_after=86400, allowable_codes=(200,), stale_if_error=True)
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=0)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    if headers:
+        s.headers.update(headers)
+    return s
+
+
+def _parse(html: str) -> BeautifulSoup:
+    """
+    Parse HTML with the C-backed lxml parser (much faster than html.parser).
+    """
+    return BeautifulSoup(html, "lxml")
 
 
 def _sleep(min_s: float, max_s: float):
@@ -37,9 +74,11 @@ def _request_text(url: str, cfg: RequestCfg, logger) -> str:
     Raises RuntimeError if all attempts fail.
     """
     last_err = None
+    url = url.split("#", 1)[0]  # fragments never reach the server; stripping improves cache hits
+    get = cfg.session.get if cfg.session is not None else requests.get
     for attempt in range(1, cfg.retries + 1):
         try:
-            r = requests.get(url, headers=cfg.headers, timeout=cfg.timeout, allow_redirects=True)
+            r = get(url, headers=cfg.headers, timeout=cfg.timeout, allow_redirects=True)
             if r.status_code >= 500:
                 raise requests.RequestException(f"Server {r.status_code}")
             return r.text
@@ -51,6 +90,39 @@ def _request_text(url: str, cfg: RequestCfg, logger) -> str:
     raise RuntimeError(f"Failed to fetch {url}: {last_err}")
 
 
+# Cap on how many profile pages are fetched concurrently.
+MAX_CONCURRENT_PROFILES = 20
+
+# Matches the company-profile prefix of a Europages product/profile path
+PROFILE_PATH_RE = re.compile(r"(/en/company/[^/]+-\d+)")
+
+# urlparse is pure and called on many repeated URLs inside the loops
+_cached_urlparse = lru_cache(maxsize=8192)(urlparse)
+
+
+async def _request_text_async(session: aiohttp.ClientSession, url: str, cfg: RequestCfg, logger) -> str:
+    """
+    Async counterpart of _request_text using a shared aiohttp session.
+    Retries with exponential backoff; raises RuntimeError if all attempts fail.
+    """
+    last_err = None
+    for attempt in range(1, cfg.retries + 1):
+        try:
+            timeout = aiohttp.ClientTimeout(total=cfg.timeout)
+            async with session.get(url, timeout=timeout, allow_redirects=True) as r:
+                if r.status >= 500:
+                    raise aiohttp.ClientResponseError(
+                        r.request_info, r.history, status=r.status, message=f"Server {r.status}"
+                    )
+                return await r.text()
+        except Exception as e:
+            last_err = e
+            logger.warning(f"[{attempt}/{cfg.retries}] GET {url} failed -> {e}")
+            if attempt < cfg.retries:
+                await asyncio.sleep(cfg.backoff_factor ** attempt)
+    raise RuntimeError(f"Failed to fetch {url}: {last_err}")
+
+
 def _build_pages(search_url: str, max_pages: int) -> List[str]:
     """
     Build a list of paginated search URLs based on max_pages.
@@ -72,34 +144,38 @@ def _extract_product_links_from_page(html: str, base_url: str, selectors: Dict)
     Extract product links from a search results page.
     Returns absolute URLs.
     Prioritizes product cards, but can fallback to any anchor matching `product_links`.
+    Uses the lexbor engine (selectolax) when available, which is much
+    faster than BS4 for selector-heavy pages; falls back to BS4 otherwise.
     """
-    soup = BeautifulSoup(html, "html.parser")
-    found: Set[str] = set()
-
     card_sel = selectors.get("product_cards") if selectors else None
     link_sel = selectors.get("product_links") if selectors else "a[href*='/en/company/'][href*='/products/']"
 
-    cards = soup.select(card_sel) if card_sel else []
-    if cards:
-        for card in cards:
-            for a in card.select(link_sel):
-                href = (a.get("href") or "").strip()
-                if not href:
-                    continue
-                if href.startswith("/"):
-                    href = urljoin(base_url, href)
-                if "/en/company/" in href and "/products/" in href:
-                    found.add(href)
+    if _HAVE_SELECTOLAX:
+        tree = LexborHTMLParser(html)
+        cards = tree.css(card_sel) if card_sel else []
+        if cards:
+            anchors = [a for card in cards for a in card.css(link_sel)]
+        else:
+            anchors = tree.css(link_sel)
+        hrefs = (a.attributes.get("href") or "" for a in anchors)
     else:
-        for a in soup.select(link_sel):
-            href = (a.get("href") or "").strip()
-            if not href:
-                continue
-            if href.startswith("/"):
-                href = urljoin(base_url, href)
-            if "/en/company/" in href and "/products/" in href:
-                found.add(href)
+        soup = _parse(html)
+        cards = soup.select(card_sel) if card_sel else []
+        if cards:
+            anchors = [a for card in cards for a in card.select(link_sel)]
+        else:
+            anchors = soup.select(link_sel)
+        hrefs = (a.get("href") or "" for a in anchors)
 
+    found: Set[str] = set()
+    for href in hrefs:
+        href = href.strip()
+        if not href:
+            continue
+        if href.startswith("/"):
+            href = urljoin(base_url, href)
+        if "/en/company/" in href and "/products/" in href:
+            found.add(href)
     return found
 
 
@@ -112,9 +188,9 @@ def _normalize_to_profile_url(product_or_profile_url: str, base_url: str) -> str
     if not product_or_profile_url:
         return None
     try:
-        p = urlparse(product_or_profile_url)
+        p = _cached_urlparse(product_or_profile_url)
         path = p.path
-        m = re.search(r"(/en/company/[^/]+-\d+)", path)
+        m = PROFILE_PATH_RE.search(path)
         if not m:
             return None
         profile_path = m.group(1)
@@ -123,12 +199,11 @@ def _normalize_to_profile_url(product_or_profile_url: str, base_url: str) -> str
         return None
 
 
-def _extract_website_from_profile_html(html: str, selectors: Dict) -> str | None:
+def _extract_website_from_profile_html(soup: BeautifulSoup, selectors: Dict) -> str | None:
     """
-    Extract external website from profile page HTML.
+    Extract external website from a parsed profile page.
     Prefers selector in config, falls back to any external HTTP link not pointing to Europages itself.
     """
-    soup = BeautifulSoup(html, "html.parser")
     sel = selectors.get("website_button", "a.website-button[href^='http']")
     a = soup.select_one(sel)
     if a and a.get("href"):
@@ -136,10 +211,13 @@ def _extract_website_from_profile_html(html: str, selectors: Dict) -> str | None
         if href.startswith("//"):
             href = "https:" + href
         return href
+    # Cheap substring test instead of a full urlparse per anchor; returns
+    # on the first external link rather than scanning every anchor
     for a in soup.select("a[href^='http']"):
-        href = a.get("href").strip()
-        if "europages." not in urlparse(href).netloc:
-            return href
+        href = (a.get("href") or "").strip()
+        if not href or "europages." in href:
+            continue
+        return href
     return None
 
 
@@ -168,6 +246,80 @@ def extract_country(soup, parent_class):
     return None
 
 
+async def _extract_one_profile_async(session: aiohttp.ClientSession, sem: asyncio.Semaphore,
+                                     profile_url: str, sample_product_url: str,
+                                     selectors: Dict, req_cfg: RequestCfg, logger) -> Dict:
+    """
+    Fetch one profile page (with product-page fallback) and extract its
+    company_name, country and external website. Runs under the shared
+    semaphore to bound concurrency against the host.
+    """
+    company_name = ""
+    country = ""
+    website = ""
+
+    async with sem:
+        try:
+            html_prof = await _request_text_async(session, profile_url, req_cfg, logger)
+            soup_prof = _parse(html_prof)
+
+            company_name = _extract_text_field(soup_prof, selectors.get("company_name"))
+            country_class = 'flex gap-1 items-center mt-0.5'
+            country = extract_country(soup_prof, country_class)
+
+            website = _extract_website_from_profile_html(soup_prof, selectors) or ""
+        except Exception as e:
+            logger.debug(f"Failed to fetch profile {profile_url}: {e}")
+
+        if not website and sample_product_url:
+            try:
+                html_prod = await _request_text_async(session, sample_product_url, req_cfg, logger)
+                soup_prod = _parse(html_prod)
+                website = _extract_website_from_profile_html(soup_prod, selectors) or ""
+                if not company_name:
+                    company_name = _extract_text_field(soup_prod, selectors.get("company_name"))
+                if not country:
+                    country = _extract_text_field(soup_prod, selectors.get("country"))
+            except Exception as e:
+                logger.debug(f"Failed to fetch product fallback {sample_product_url}: {e}")
+
+        await asyncio.sleep(random.uniform(req_cfg.min_delay, req_cfg.max_delay))
+
+    website = website or ""
+    try:
+        if website and "europages." in _cached_urlparse(website).netloc:
+            website = ""
+    except Exception:
+        website = ""
+
+    return {
+        "company_name": company_name,
+        "country": country,
+        "profile_url": profile_url,
+        "website_url": website,
+    }
+
+
+async def _extract_profiles_async(profile_to_sample_product: Dict[str, str], selectors: Dict,
+                                  req_cfg: RequestCfg, logger) -> List[Dict]:
+    """
+    Visit all profile pages concurrently through one shared aiohttp session.
+    The connector reuses sockets and DNS lookups across requests.
+    """
+    sem = asyncio.Semaphore(MAX_CONCURRENT_PROFILES)
+    connector = aiohttp.TCPConnector(
+        limit=64, limit_per_host=4, use_dns_cache=True, ttl_dns_cache=600,
+        enable_cleanup_closed=True,
+    )
+
+    async with aiohttp.ClientSession(connector=connector, headers=req_cfg.headers) as session:
+        return list(await asyncio.gather(*[
+            _extract_one_profile_async(session, sem, profile_url, sample_product_url,
+                                       selectors, req_cfg, logger)
+            for profile_url, sample_product_url in profile_to_sample_product.items()
+        ]))
+
+
 def extract_profiles(cfg: Dict, logger) -> List[Dict]:
     """
     Main function to extract company profiles for a sector from Europages.
@@ -206,69 +358,32 @@ def extract_profiles(cfg: Dict, logger) -> List[Dict]:
     pages = _build_pages(search_url, max_pages)
     profile_to_sample_product: Dict[str, str] = {}
 
-    # 1) Collect product links and map them to their profile URLs
-    for idx, url in enumerate(pages, start=1):
-        logger.info(f"Fetching results page {idx}/{len(pages)}: {url}")
-        html = _request_text(url, req_cfg, logger)
-        product_links = _extract_product_links_from_page(html, base_url, selectors)
-        if not product_links:
-            logger.warning(f"No product links found on page {idx}: {url}")
-
-        for p in product_links:
-            profile = _normalize_to_profile_url(p, base_url)
-            if profile:
-                profile_to_sample_product.setdefault(profile, p)
-
-        _sleep(req_cfg.min_delay, req_cfg.max_delay)
+    # 1) Collect product links and map them to their profile URLs,
+    #    reusing one keep-alive session across all results pages
+    req_cfg.session = _make_session(req_cfg.headers, cfg.get("http_cache", ".http_cache"))
+    try:
+        for idx, url in enumerate(pages, start=1):
+            logger.info(f"Fetching results page {idx}/{len(pages)}: {url}")
+            html = _request_text(url, req_cfg, logger)
+            product_links = _extract_product_links_from_page(html, base_url, selectors)
+            if not product_links:
+                logger.warning(f"No product links found on page {idx}: {url}")
+
+            for p in product_links:
+                profile = _normalize_to_profile_url(p, base_url)
+                if profile:
+                    profile_to_sample_product.setdefault(profile, p)
+
+            _sleep(req_cfg.min_delay, req_cfg.max_delay)
+    finally:
+        req_cfg.session.close()
+        req_cfg.session = None
 
     logger.info(f"Found {len(profile_to_sample_product)} unique company profiles across pages.")
 
-    # 2) Visit each profile to extract metadata and external website
-    profiles: List[Dict] = []
-    for i, (profile_url, sample_product_url) in enumerate(profile_to_sample_product.items(), start=1):
-        company_name = ""
-        country = ""
-        website = ""
-
-        try:
-            html_prof = _request_text(profile_url, req_cfg, logger)
-            soup_prof = BeautifulSoup(html_prof, "html.parser")
-
-            company_name = _extract_text_field(soup_prof, selectors.get("company_name"))
-            country_class = 'flex gap-1 items-center mt-0.5'
-            country = extract_country(soup_prof, country_class)
-
-            website = _extract_website_from_profile_html(html_prof, selectors) or ""
-        except Exception as e:
-            logger.debug(f"Failed to fetch profile {profile_url}: {e}")
-
-        if not website and sample_product_url:
-            try:
-                html_prod = _request_text(sample_product_url, req_cfg, logger)
-                website = _extract_website_from_profile_html(html_prod, selectors) or ""
-                if not company_name:
-                    soup_prod = BeautifulSoup(html_prod, "html.parser")
-                    company_name = _extract_text_field(soup_prod, selectors.get("company_name"))
-                if not country:
-                    soup_prod = BeautifulSoup(html_prod, "html.parser")
-                    country = _extract_text_field(soup_prod, selectors.get("country"))
-            except Exception as e:
-                logger.debug(f"Failed to fetch product fallback {sample_product_url}: {e}")
-
-        website = website or ""
-        try:
-            if website and "europages." in urlparse(website).netloc:
-                website = ""
-        except Exception:
-            website = ""
-
-        profiles.append({
-            "company_name": company_name,
-            "country": country,
-            "profile_url": profile_url,
-            "website_url": website,
-        })
-
-        _sleep(req_cfg.min_delay, req_cfg.max_delay)
+    # 2) Visit profiles concurrently to extract metadata and external website
+    profiles = asyncio.run(
+        _extract_profiles_async(profile_to_sample_product, selectors, req_cfg, logger)
+    )
 
     return profiles
@@ -1,9 +1,15 @@
 from pathlib import Path
+from functools import lru_cache
 import argparse
 import csv
 import yaml
 from utils.logger import setup_logger
 
+try:
+    from yaml import CSafeLoader as _YamlLoader  # libyaml, 5-10x faster
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 from link_extractor import extract_profiles as europages_extractor
 from yellowpages_extractor import extract_profiles as yellowpages_extractor
 from email_scraper import scrape_emails_for_profiles, _normalize_url
@@ -14,6 +20,16 @@ def sector_slug_from_key(key: str) -> str:
     return key.split("_", 1)[1] if "_" in key else key
 
 
+@lru_cache(maxsize=8)
+def _load_cfg(path_str: str, mtime: float) -> dict:
+    """
+    Parse a sector config file, cached on (path, mtime) so repeated runs
+    in one process reuse the parsed result until the file changes.
+    """
+    with open(path_str, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Full pipeline: extract profiles, links and emails.")
     parser.add_argument("--root", default="..", help="Repo root (parent of src/)")
@@ -36,8 +52,7 @@ def main():
 
     logger = setup_logger("pipeline", logs_dir)
 
-    with open(cfg_path, "r", encoding="utf-8") as f:
-        all_cfg = yaml.safe_load(f)
+    all_cfg = _load_cfg(str(cfg_path), cfg_path.stat().st_mtime)
 
     cfg_key = args.sector
     if cfg_key not in all_cfg:
@@ -70,13 +85,15 @@ def main():
     with open(profiles_path, "w", newline="", encoding="utf-8") as f:
         w = csv.DictWriter(f, fieldnames=["company_name", "country", "profile_url", "website_url"])
         w.writeheader()
-        for r in profiles:
-            w.writerow({
+        w.writerows(
+            {
                 "company_name": r.get("company_name", ""),
                 "country": r.get("country", ""),
                 "profile_url": r.get("profile_url", ""),
                 "website_url": r.get("website_url", ""),
-            })
+            }
+            for r in profiles
+        )
     logger.info(f"Saved {len(profiles)} profiles -> {profiles_path}")
 
     # 2. Save personal websites (normalized and deduplicated)
@@ -89,8 +106,7 @@ def main():
     with open(links_out, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
         w.writerow(["url"])
-        for u in personal_sites:
-            w.writerow([u])
+        w.writerows([u] for u in personal_sites)
     logger.info(f"Saved {len(personal_sites)} personal websites -> {links_out}")
 
     if args.skip_emails:
@@ -129,12 +145,14 @@ def main():
     with open(emails_out, "w", newline="", encoding="utf-8") as f:
         w = csv.DictWriter(f, fieldnames=["company_name", "country", "email"])
         w.writeheader()
-        for r in cleaned_emails:
-            w.writerow({
+        w.writerows(
+            {
                 "company_name": r.get("company_name", ""),
                 "country": r.get("country", ""),
                 "email": r.get("email", "")
-            })
+            }
+            for r in cleaned_emails
+        )
     logger.info(f"Saved {len(cleaned_emails)} email rows -> {emails_out}")
 
 
@@ -1,8 +1,15 @@
 from __future__ import annotations
+import atexit
 import logging
+import queue
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
 from pathlib import Path
 import sys
 
+# Listeners started by setup_logger, stopped (and flushed) in shutdown()
+_listeners: list[QueueListener] = []
+
+
 def setup_logger(name: str = "pipeline", logs_dir: Path | None = None) -> logging.Logger:
     logger = logging.getLogger(name)
     if logger.handlers:
@@ -10,19 +17,48 @@ def setup_logger(name: str = "pipeline", logs_dir: Path | None = None) -> loggin
 
     logger.setLevel(logging.INFO)
 
+    fmt = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
     # Console handler
     ch = logging.StreamHandler(sys.stdout)
-    ch.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
-    logger.addHandler(ch)
+    ch.setFormatter(fmt)
+    handlers: list[logging.Handler] = [ch]
 
-    # file handler
+    # file handler, wrapped in a MemoryHandler so disk flushes batch
+    file_err = None
     if logs_dir:
         try:
             logs_dir.mkdir(parents=True, exist_ok=True)
             fh = logging.FileHandler(logs_dir / "pipeline.log", encoding="utf-8")
-            fh.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
-            logger.addHandler(fh)
+            fh.setFormatter(fmt)
+            handlers.append(MemoryHandler(capacity=1024, target=fh))
         except Exception as e:
-            logger.warning(f"Could not create log file in {logs_dir}: {e}")
+            file_err = e
+
+    # Records go to an in-memory queue and are drained on a background
+    # thread, keeping log I/O off the scraper's critical path
+    q: queue.Queue = queue.Queue(-1)
+    logger.addHandler(QueueHandler(q))
+    listener = QueueListener(q, *handlers)
+    listener.start()
+    _listeners.append(listener)
+
+    if file_err is not None:
+        logger.warning(f"Could not create log file in {logs_dir}: {file_err}")
 
     return logger
+
+
+def shutdown():
+    """
+    Stop all queue listeners, flushing any buffered log records.
+    Registered via atexit so buffered file records are not lost.
+    """
+    while _listeners:
+        listener = _listeners.pop()
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+atexit.register(shutdown)
@@ -1,26 +1,106 @@
 from __future__ import annotations
+import asyncio
+import hashlib
 import random
+from concurrent.futures import ThreadPoolExecutor
+import sqlite3
 import time
-from dataclasses import dataclass
-from typing import Dict, List, Set
-from urllib.parse import urljoin
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Set
 import re
 
+import aiohttp
+import orjson
 import requests
-from bs4 import BeautifulSoup
+import soupsieve
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
+from functools import lru_cache
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
+from lxml.etree import XPath
+
+# Default politeness cap on concurrent profile-page fetches against the
+# host; overridable per sector via cfg['workers'].
+MAX_CONCURRENT_PROFILES = 8
+
+# Profiles are fetched in batches of workers * this factor so
+# iter_profiles can yield rows as each batch lands instead of after the
+# whole crawl.
+PROFILE_BATCH_FACTOR = 4
+
+# Default listing-page selector and its precompiled XPath translation;
+# compiled XPath on the lxml tree avoids soupsieve dispatch per page.
+_DEFAULT_PROFILE_LINKS_SEL = 'div.text-xl.font-bold a.flex[href^="/"]'
+_PROFILE_XPATH = XPath(
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' text-xl ')"
+    " and contains(concat(' ', normalize-space(@class), ' '), ' font-bold ')]"
+    "//a[contains(concat(' ', normalize-space(@class), ' '), ' flex ')"
+    " and starts-with(@href, '/')]/@href"
+)
+
+# Profile hrefs look like /company-name-12345; compiled once so the
+# per-link filter in the pagination loop skips the re-cache lookup.
+_PROFILE_HREF_RE = re.compile(r'^/[a-z0-9-]+-\d+')
+
+# Only materialize the tags the profile selectors can touch (name in h2,
+# city in a div/span grid, website in a button); everything else on the
+# page is skipped at parse time. div is included because the configured
+# city selector anchors on a div ancestor.
+_PROFILE_STRAINER = SoupStrainer(["h2", "div", "span", "button"])
+
+
+@lru_cache(maxsize=8)
+def _compiled_css(sel: str) -> CSSSelector:
+    """Compile a config-supplied CSS selector once per process."""
+    return CSSSelector(sel)
+
+
+@dataclass
+class ProfileSelectors:
+    """
+    Soupsieve matchers for the profile page, compiled once per crawl
+    instead of re-tokenizing the selector strings for every page.
+    """
+    company_name: soupsieve.SoupSieve
+    city: soupsieve.SoupSieve
+    website_button: soupsieve.SoupSieve
+
+
+@dataclass(slots=True)
+class Profile:
+    """
+    One scraped company row. Slotted to keep per-row memory flat on
+    multi-thousand-profile crawls; converted to a plain dict at the
+    iter_profiles boundary.
+    """
+    company_name: str
+    country: str | None
+    website_url: str | None
+    profile_url: str
+
+
+def _build_profile_selectors(selectors: Dict) -> ProfileSelectors:
+    return ProfileSelectors(
+        company_name=soupsieve.compile(selectors.get("company_name", "h2")),
+        city=soupsieve.compile(selectors.get("city", "span.city")),
+        website_button=soupsieve.compile(selectors.get("website_button", "button[title][data-url]")),
+    )
 
 
 @dataclass
 class RequestCfg:
     """
     Configuration for HTTP requests including:
-      - timeout (seconds)
-      - number of retries
+      - connect_timeout / timeout (seconds): a stalled connect fails fast
+        instead of burning the whole read budget
+      - number of retries (additional attempts after the first)
       - exponential backoff factor for retry delays
       - minimum and maximum delay between requests
       - optional custom headers
     """
     timeout: int = 25
+    connect_timeout: float = 5.0
     retries: int = 1
     backoff_factor: float = 1.8
     min_delay: float = 1.0
@@ -28,83 +108,241 @@ class RequestCfg:
     headers: dict | None = None
 
 
-def _sleep(min_s: float, max_s: float):
+def _is_retryable_status(status: int | None) -> bool:
+    """Retry server-side failures and throttling; 4xx like 404 are final."""
+    return status is not None and (status >= 500 or status == 429)
+
+
+def _retry_delay(headers, attempt: int, cfg: RequestCfg) -> float:
+    """
+    Seconds to sleep before the next attempt. A throttling server's
+    Retry-After header takes precedence over our exponential backoff;
+    both get jitter so retries from parallel workers do not align.
+    """
+    retry_after = headers.get("Retry-After") if headers else None
+    if retry_after:
+        try:
+            return float(retry_after) + random.uniform(0, 1)
+        except ValueError:
+            pass  # HTTP-date form; fall back to backoff
+    return cfg.backoff_factor ** attempt + random.uniform(0, 0.5)
+
+
+class RateLimiter:
     """
-    Sleep for a random duration between min_s and max_s seconds.
-    Used to avoid hitting the server too quickly.
+    Token-bucket pacing tied to a requests-per-minute budget.
+
+    Unlike a flat sleep after every request, .wait() only sleeps for
+    whatever remains of the per-request interval, so time already spent
+    waiting on a slow response counts against the budget.
+
+    The timestamp is taken when the slot is granted (request start), so
+    fetch and parse time overlap the politeness delay: after a 600 ms
+    fetch+parse, only the remainder of the interval is slept.
     """
-    time.sleep(random.uniform(min_s, max_s))
+
+    def __init__(self, rpm: float, jitter: float = 0.5):
+        self.min_interval = 60.0 / rpm if rpm > 0 else 0.0
+        self.jitter = jitter
+        self._last = 0.0
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop: asyncio.AbstractEventLoop | None = None
+
+    def wait(self):
+        sleep_for = self._last + self.min_interval + random.uniform(0, self.jitter) - time.monotonic()
+        if sleep_for > 0:
+            time.sleep(sleep_for)
+        self._last = time.monotonic()
+
+    async def wait_async(self):
+        # The lock is bound to an event loop on first use; batched crawls
+        # run one asyncio.run per batch, so rebind when the loop changes.
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        async with self._lock:
+            sleep_for = self._last + self.min_interval + random.uniform(0, self.jitter) - time.monotonic()
+            if sleep_for > 0:
+                await asyncio.sleep(sleep_for)
+            self._last = time.monotonic()
+
+
+def _make_session(headers: dict | None) -> requests.Session:
+    """
+    Build a pooled requests.Session with keep-alive so successive
+    requests to the same host reuse one TCP+TLS connection instead of
+    paying a handshake per page.
+    """
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=0)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    if headers:
+        s.headers.update(headers)
+    return s
 
 
-def _request_text(url: str, cfg: RequestCfg, logger) -> str:
+def _request_bytes(session: requests.Session, url: str, cfg: RequestCfg, logger) -> bytes:
     """
-    Perform a GET request to fetch HTML content of a URL.
-    Retries on failure up to cfg.retries times with exponential backoff.
+    Perform a GET request to fetch HTML content of a URL through the
+    shared session. Retries on failure up to cfg.retries times with
+    exponential backoff.
+
+    Returns the raw body bytes: both lxml and BeautifulSoup sniff the
+    encoding themselves in C, which avoids requests' chardet pass on
+    responses without a charset header.
 
     Raises RuntimeError if all attempts fail.
     """
     last_err = None
-    for attempt in range(1, cfg.retries + 1):
+    for attempt in range(cfg.retries + 1):
         try:
-            r = requests.get(url, headers=cfg.headers, timeout=cfg.timeout, allow_redirects=True)
+            r = session.get(url, timeout=(cfg.connect_timeout, cfg.timeout), allow_redirects=True)
             r.raise_for_status()
-            return r.text
-        except Exception as e:
+            logger.debug(f"GET {url} Content-Encoding={r.headers.get('Content-Encoding', 'identity')}")
+            return r.content
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if not _is_retryable_status(status):
+                raise RuntimeError(f"Failed to fetch {url}: {e}") from e
+            last_err = e
+            retry_headers = e.response.headers if e.response is not None else None
+        except (requests.ConnectionError, requests.Timeout,
+                requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.ContentDecodingError) as e:
+            # Mid-body disconnects and truncated/corrupt encodings are as
+            # transient as a refused connection; retry them.
             last_err = e
-            logger.warning(f"[{attempt}/{cfg.retries}] GET {url} failed -> {e}")
-            if attempt < cfg.retries:
-                time.sleep(cfg.backoff_factor ** attempt)
+            retry_headers = None
+        except requests.RequestException as e:
+            # Anything else (redirect loops, invalid URLs, ...) is final
+            raise RuntimeError(f"Failed to fetch {url}: {e}") from e
+        logger.warning(f"[{attempt + 1}/{cfg.retries + 1}] GET {url} failed -> {last_err}")
+        if attempt < cfg.retries:
+            time.sleep(_retry_delay(retry_headers, attempt, cfg))
     raise RuntimeError(f"Failed to fetch {url}: {last_err}")
 
 
-def _extract_data_from_profile_page(html: str, selectors: Dict, profile_url: str, logger) -> Dict | None:
+async def _request_bytes_async(session: aiohttp.ClientSession, url: str, cfg: RequestCfg, logger) -> bytes:
     """
-    Extract company metadata from a profile page.
+    Async counterpart of _request_bytes using a shared aiohttp session.
+    Retries with exponential backoff; raises RuntimeError if all attempts fail.
+    """
+    last_err = None
+    for attempt in range(cfg.retries + 1):
+        try:
+            timeout = aiohttp.ClientTimeout(total=cfg.timeout, connect=cfg.connect_timeout)
+            async with session.get(url, timeout=timeout, allow_redirects=True) as r:
+                r.raise_for_status()
+                return await r.read()
+        except aiohttp.ClientResponseError as e:
+            if not _is_retryable_status(e.status):
+                raise RuntimeError(f"Failed to fetch {url}: {e}") from e
+            last_err = e
+            retry_headers = e.headers
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError,
+                asyncio.TimeoutError) as e:
+            # ClientPayloadError covers mid-body disconnects and corrupt
+            # transfer encodings; as transient as a refused connection.
+            last_err = e
+            retry_headers = None
+        except aiohttp.ClientError as e:
+            # Anything else (redirect loops, invalid URLs, ...) is final
+            raise RuntimeError(f"Failed to fetch {url}: {e}") from e
+        logger.warning(f"[{attempt + 1}/{cfg.retries + 1}] GET {url} failed -> {last_err}")
+        if attempt < cfg.retries:
+            await asyncio.sleep(_retry_delay(retry_headers, attempt, cfg))
+    raise RuntimeError(f"Failed to fetch {url}: {last_err}")
+
 
-    Returns a dict with:
-      - company_name
-      - country (city)
-      - website_url
-      - profile_url
+def _extract_data_from_profile_page(html: bytes | str, sels: ProfileSelectors, profile_url: str, logger) -> Profile | None:
+    """
+    Extract company metadata from a profile page.
 
-    Uses CSS selectors from the config. If company name is missing, returns None.
+    Returns a Profile (company_name, country/city, website_url,
+    profile_url) built with precompiled selectors. If the company name
+    is missing, returns None.
     """
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = BeautifulSoup(html, 'lxml', parse_only=_PROFILE_STRAINER)
 
-    # Company Name
-    name_elem = soup.select_one(selectors.get("company_name", "h2"))
+    # Company Name first: a missing name discards the whole row, so the
+    # city/website selectors never run on skeleton or error pages.
+    name_elem = sels.company_name.select_one(soup)
     name = name_elem.text.strip() if name_elem else None
+    if not name:
+        logger.warning(f"Could not extract company name from {profile_url}. Skipping.")
+        return None
 
     # City
-    city_elem = soup.select_one(selectors.get("city", "span.city"))
+    city_elem = sels.city.select_one(soup)
     city = city_elem.text.strip() if city_elem else None
 
     # Website URL
-    website_elem = soup.select_one(selectors.get("website_button", "button[title][data-url]"))
+    website_elem = sels.website_button.select_one(soup)
     website = website_elem['title'] if website_elem and website_elem.has_attr('title') else None
 
-    if not name:
-        logger.warning(f"Could not extract company name from {profile_url}. Skipping.")
-        return None
+    return Profile(
+        company_name=name,
+        country=city,
+        website_url=website,
+        profile_url=profile_url,
+    )
 
-    return {
-        "company_name": name,
-        "country": city,
-        "website_url": website,
-        "profile_url": profile_url
-    }
 
+async def _visit_profile_async(session: aiohttp.ClientSession, sem: asyncio.Semaphore,
+                               limiter: RateLimiter, profile_url: str, sels: ProfileSelectors,
+                               req_cfg: RequestCfg, logger, idx: int, total: int) -> Profile | None:
+    """
+    Fetch one profile page under the shared semaphore and extract its data.
+    Returns None when the fetch fails or the page has no company name.
+    """
+    async with sem:
+        await limiter.wait_async()
+        logger.info(f"[{idx}/{total}] Scraping profile page: {profile_url}")
+        company_data = None
+        try:
+            profile_html = await _request_bytes_async(session, profile_url, req_cfg, logger)
+            company_data = _extract_data_from_profile_page(profile_html, sels, profile_url, logger)
+        except RuntimeError as e:
+            logger.error(f"Failed to scrape profile page {profile_url}: {e}")
+    return company_data
 
-def extract_profiles(cfg: Dict, logger) -> List[Dict]:
+
+async def _visit_profiles_async(profile_urls: List[str], sels: ProfileSelectors,
+                                limiter: RateLimiter, req_cfg: RequestCfg, logger,
+                                offset: int = 0, total: int | None = None,
+                                workers: int = MAX_CONCURRENT_PROFILES) -> List[Profile]:
+    """
+    Visit a batch of profile pages concurrently through one shared
+    aiohttp session, bounded by `workers` in-flight requests against the
+    single host. offset/total only affect progress logging.
     """
-    Main function to extract all company profiles for a given category.
+    total = total if total is not None else len(profile_urls)
+    sem = asyncio.Semaphore(workers)
+    connector = aiohttp.TCPConnector(limit=max(50, workers), limit_per_host=workers)
+
+    async with aiohttp.ClientSession(connector=connector, headers=req_cfg.headers) as session:
+        results = await asyncio.gather(*[
+            _visit_profile_async(session, sem, limiter, url, sels, req_cfg, logger, i, total)
+            for i, url in enumerate(profile_urls, start=offset + 1)
+        ])
+
+    return [r for r in results if r]
+
+
+def iter_profiles(cfg: Dict, logger) -> Iterator[Dict]:
+    """
+    Lazily extract all company profiles for a given category.
 
     Steps:
       1. Loop through paginated search results (up to cfg['max_pages']).
       2. Extract candidate profile links from each page using CSS selectors.
       3. Filter and normalize links to absolute profile URLs.
-      4. Visit each profile URL to scrape detailed metadata using _extract_data_from_profile_page.
-      5. Return a list of dictionaries containing company_name, country, website_url, profile_url.
+      4. Visit profile URLs in concurrent batches and yield each scraped
+         row (company_name, country, website_url, profile_url) as its
+         batch completes, so callers can stream results to disk without
+         holding the whole crawl in memory.
     """
     base_url = cfg["base_url"].rstrip("/")
     category = cfg.get("category")
@@ -113,10 +351,11 @@ def extract_profiles(cfg: Dict, logger) -> List[Dict]:
 
     if not category:
         logger.error("Category not provided in config.")
-        return []
+        return
 
     req_cfg = RequestCfg(
         timeout=int(cfg.get("timeout", 25)),
+        connect_timeout=float(cfg.get("connect_timeout", 5.0)),
         retries=int(cfg.get("retries", 3)),
         backoff_factor=float(cfg.get("backoff_factor", 1.8)),
         min_delay=float(cfg.get("min_delay", 1.0)),
@@ -127,61 +366,134 @@ def extract_profiles(cfg: Dict, logger) -> List[Dict]:
                 "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123 Safari/537.36"
             ),
             "Accept-Language": "en-US,en;q=0.9",
+            # Ask for compressed bodies; requests decodes transparently
+            # (brotli support comes from the brotli package).
+            "Accept-Encoding": "gzip, br, deflate",
         },
     )
 
     profile_urls: Set[str] = set()
 
-    # Part 1: Scrape all profile URLs across paginated search results
-    for page_num in range(1, max_pages + 1):
-        page_url = f"{base_url}/uae/{category}?page={page_num}"
-        logger.info(f"Fetching search page {page_num}/{max_pages}: {page_url}")
-
-        try:
-            response_text = _request_text(page_url, req_cfg, logger)
-        except RuntimeError as e:
-            logger.error(e)
-            continue
-
-        soup = BeautifulSoup(response_text, 'html.parser')
+    # Default budget mirrors the old min_delay pacing (one request per
+    # min_delay seconds), with max_delay - min_delay as jitter.
+    rpm = float(cfg.get("requests_per_minute",
+                        60.0 / req_cfg.min_delay if req_cfg.min_delay > 0 else 0.0))
+    limiter = RateLimiter(rpm, jitter=max(0.0, req_cfg.max_delay - req_cfg.min_delay))
 
-        listing_links = soup.select(
-            selectors.get('profile_links', 'div.text-xl.font-bold a.flex[href^="/"]')
-        )
+    # The checkpoint is opened before pagination so its URL keys can
+    # pre-seed the early-exit test below: on an incremental re-crawl,
+    # profiles scraped on previous runs also count as already known.
+    cache = sqlite3.connect(cfg.get("cache_path", "crawl.sqlite"))
+    try:
+        cache.execute("CREATE TABLE IF NOT EXISTS done(url TEXT PRIMARY KEY, payload TEXT)")
+        done = dict(cache.execute("SELECT url, payload FROM done"))
+        known = set(done)
 
-        candidate_urls = [a["href"] for a in listing_links if a.has_attr("href")]
-        logger.info(f"Page {page_num}: found {len(candidate_urls)} candidate links")
+        session = _make_session(req_cfg.headers)
+        empty_streak = 0
 
-        for href in candidate_urls:
-            if not href:
-                continue
-
-            if re.match(r'^/[a-z0-9-]+-\d+', href):
-                clean_href = href.split("?")[0]   # strip query params
-                full_url = urljoin(base_url, clean_href)
-                profile_urls.add(full_url)
-
-        logger.info(f"Total unique links collected so far: {len(profile_urls)}")
-        _sleep(req_cfg.min_delay, req_cfg.max_delay)
-
-    logger.info(f"Found {len(profile_urls)} unique company profiles across {max_pages} pages.")
-    if not profile_urls:
-        return []
-
-    all_businesses: List[Dict] = []
-
-    # Part 2: Visit each profile URL to extract detailed data
-    for i, profile_url in enumerate(sorted(profile_urls), start=1):
-        logger.info(f"[{i}/{len(profile_urls)}] Scraping profile page: {profile_url}")
+        def _fetch_page(n: int) -> bytes:
+            limiter.wait()
+            return _request_bytes(session, f"{base_url}/uae/{category}?page={n}", req_cfg, logger)
 
         try:
-            profile_html = _request_text(profile_url, req_cfg, logger)
-            company_data = _extract_data_from_profile_page(profile_html, selectors, profile_url, logger)
-            if company_data:
-                all_businesses.append(company_data)
-        except RuntimeError as e:
-            logger.error(f"Failed to scrape profile page {profile_url}: {e}")
+            # Part 1: Scrape all profile URLs across paginated search results.
+            # The next page downloads on a background thread while the
+            # current one is being parsed, overlapping network and CPU time.
+            with ThreadPoolExecutor(max_workers=1) as prefetcher:
+                future = prefetcher.submit(_fetch_page, 1)
+                for page_num in range(1, max_pages + 1):
+                    logger.info(f"Fetching search page {page_num}/{max_pages}")
+
+                    try:
+                        response_body = future.result()
+                    except RuntimeError as e:
+                        logger.error(e)
+                        response_body = None
+                    if page_num < max_pages:
+                        future = prefetcher.submit(_fetch_page, page_num + 1)
+                    if response_body is None:
+                        continue
+
+                    tree = lxml_html.fromstring(response_body)
+
+                    link_sel = selectors.get('profile_links', _DEFAULT_PROFILE_LINKS_SEL)
+                    if link_sel == _DEFAULT_PROFILE_LINKS_SEL:
+                        candidate_urls = [str(href) for href in _PROFILE_XPATH(tree)]
+                    else:
+                        candidate_urls = [a.get("href") for a in _compiled_css(link_sel)(tree) if a.get("href")]
+                    logger.info(f"Page {page_num}: found {len(candidate_urls)} candidate links")
+
+                    # Matched hrefs always start with '/', so plain concatenation
+                    # replaces urljoin and skips re-parsing base_url per link.
+                    matched = {
+                        base_url + href.partition("?")[0]   # strip query params
+                        for href in candidate_urls
+                        if href and _PROFILE_HREF_RE.match(href)
+                    }
+                    new_urls = matched - profile_urls - known
+                    profile_urls |= matched
+
+                    # Consecutive pages whose profiles are all already known
+                    # (seen earlier this run or checkpointed by a previous
+                    # one) mean the rest of the pagination is stale.
+                    if candidate_urls and not new_urls:
+                        empty_streak += 1
+                        if empty_streak >= 2:
+                            logger.info(f"No new profiles on {empty_streak} consecutive pages; "
+                                        f"stopping pagination at page {page_num}.")
+                            future.cancel()
+                            break
+                    else:
+                        empty_streak = 0
+
+                    logger.info(f"Total unique links collected so far: {len(profile_urls)}")
+
+            logger.info(f"Found {len(profile_urls)} unique company profiles across {max_pages} pages.")
+        finally:
+            session.close()
+
+        if not profile_urls:
+            return
+
+        # Part 2: Visit profile URLs in concurrent batches, yielding each
+        # batch's rows as soon as it lands. Successfully scraped profiles
+        # are checkpointed to sqlite keyed on profile_url, so an
+        # interrupted crawl resumes by replaying cached rows instead of
+        # re-hitting the server.
+        profile_sels = _build_profile_selectors(selectors)
+        workers = int(cfg.get("workers", MAX_CONCURRENT_PROFILES))
+        batch_size = workers * PROFILE_BATCH_FACTOR
+
+        cached = [u for u in profile_urls if u in done]
+        if cached:
+            logger.info(f"Resuming: {len(cached)} of {len(profile_urls)} profiles already scraped.")
+            for u in sorted(cached):
+                yield orjson.loads(done[u])
+
+        # Deterministic hash-shuffle: lexicographic order clusters URLs
+        # from the same sub-listing back-to-back, which concentrates load
+        # on one backend shard; hashing spreads them while keeping runs
+        # (and the checkpoint) reproducible.
+        ordered = sorted(profile_urls - set(cached),
+                         key=lambda u: hashlib.blake2b(u.encode(), digest_size=8).digest())
+        for start in range(0, len(ordered), batch_size):
+            batch = ordered[start:start + batch_size]
+            rows = asyncio.run(
+                _visit_profiles_async(batch, profile_sels, limiter, req_cfg, logger,
+                                      offset=start, total=len(ordered), workers=workers)
+            )
+            dict_rows = [asdict(row) for row in rows]
+            cache.executemany(
+                "INSERT OR REPLACE INTO done(url, payload) VALUES(?, ?)",
+                [(d["profile_url"], orjson.dumps(d)) for d in dict_rows],
+            )
+            cache.commit()
+            yield from dict_rows
+    finally:
+        cache.close()
 
-        _sleep(req_cfg.min_delay, req_cfg.max_delay)
 
-    return all_businesses
+def extract_profiles(cfg: Dict, logger) -> List[Dict]:
+    """Eager wrapper around iter_profiles for callers that want a list."""
+    return list(iter_profiles(cfg, logger))
@@ -0,0 +1,42 @@
+import pytest
+from src.data_cleaner import clean_and_validate_emails, _clean_emails_large, _clean_emails_small
+
+
+def test_clean_and_validate_emails():
+    raw_data = [
+        {"name": "Good Co", "country": "France", "email": "info@example.com"},
+        {"name": "Free Mail", "country": "Germany", "email": "someone@gmail.com"},
+        {"name": "Asset", "country": "Italy", "email": "logo@2x-123.jpg"},
+        {"name": "Dup A", "country": "Spain", "email": "sales@winery.es"},
+        {"name": "Dup B", "country": "Spain", "email": "sales@winery.es"},
+        {"name": "Empty", "country": "Portugal", "email": ""},
+    ]
+
+    cleaned = clean_and_validate_emails(raw_data, {"gmail.com"})
+
+    assert cleaned == [
+        {"company_name": "Good Co", "country": "France", "email": "info@example.com"},
+        {"company_name": "Dup A", "country": "Spain", "email": "sales@winery.es"},
+    ]
+
+
+def test_clean_emails_large_matches_small():
+    raw_data = [
+        {"name": "Good Co", "country": "France", "email": "info@example.com"},
+        {"name": "Free Mail", "country": "Germany", "email": "someone@gmail.com"},
+        {"name": "Asset", "country": "Italy", "email": "logo@2x-123.jpg"},
+        {"name": "Dup A", "country": "Spain", "email": "sales@winery.es"},
+        {"name": "Dup B", "country": "Spain", "email": "sales@winery.es"},
+        {"name": "Empty", "country": "Portugal", "email": ""},
+        {"country": "Greece", "email": "nameless@olives.gr"},
+    ]
+    ignore = {"gmail.com"}
+
+    large = _clean_emails_large(raw_data, ignore)
+
+    assert large == _clean_emails_small(raw_data, ignore)
+    assert large == [
+        {"company_name": "Good Co", "country": "France", "email": "info@example.com"},
+        {"company_name": "Dup A", "country": "Spain", "email": "sales@winery.es"},
+        {"company_name": "", "country": "Greece", "email": "nameless@olives.gr"},
+    ]